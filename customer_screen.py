@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 from PIL import Image
 import io
+from recommendations import RecommendationEngine
+
+# Number of "frequently bought together" products shown for the cart
+RECOMMENDATION_LIMIT = 4
 
 # Define the UIController class
 class UIController:
@@ -22,6 +26,34 @@ class UIController:
             st.error(f"Error fetching cart details: {e}")
             return None
 
+    def fetch_user_cart_products(self):
+        """
+        Fetches the product IDs in the current user's own cart.
+        Returns:
+            list: Product IDs of the current user's cart lines.
+        """
+        try:
+            query = "SELECT product_id FROM ONLINE_RETAIL.cart_info WHERE user_id = CURRENT_USER;"
+            df = pd.read_sql_query(query, self.conn)
+            return df["product_id"].tolist()
+        except Exception as e:
+            st.error(f"Error fetching your cart: {e}")
+            return None
+
+    def fetch_cart_history(self):
+        """
+        Fetches which products each user has ever put in the cart.
+        Returns:
+            pd.DataFrame: DataFrame containing user_id and product_id pairs.
+        """
+        try:
+            query = "SELECT DISTINCT user_id, product_id FROM ONLINE_RETAIL.cart_history;"
+            df = pd.read_sql_query(query, self.conn)
+            return df
+        except Exception as e:
+            st.error(f"Error fetching cart history: {e}")
+            return None
+
     def fetch_available_products(self):
         """
         Fetches available products with quantity > 0.
@@ -43,6 +75,19 @@ class UIController:
             st.error(f"Error fetching available products: {e}")
             return None
 
+# Function to get the shared recommendation engine.
+# Built from the append-only cart history once per server process and kept up
+# to date by add_to_cart, so page reruns only do dictionary lookups. Raises if
+# the history cannot be loaded so that an empty engine is never cached.
+@st.cache_resource(show_spinner=False)
+def get_recommendation_engine(_conn):
+    history = UIController(_conn).fetch_cart_history()
+    if history is None:
+        raise RuntimeError("Unable to load cart history for recommendations.")
+    engine = RecommendationEngine()
+    engine.build(history)
+    return engine
+
 # Function to get the current user from the database
 def get_current_user(conn):
     try:
@@ -77,12 +122,46 @@ def add_to_cart(conn, cart_items, user_id):
         
         conn.commit()  # Commit the transaction
         st.success("Items added to the cart successfully!")
-        
-        # Trigger a rerun to refresh the cart details
-        st.rerun()
     except Exception as e:
         conn.rollback()  # Rollback in case of an error
         st.error(f"Error adding items to the cart: {e}")
+        return
+    
+    # Fold the new cart lines into the recommendations. The items are already
+    # saved, so a failure here must not be reported as a failed add to cart.
+    try:
+        get_recommendation_engine(conn).update(user_id, [item["product_id"] for item in cart_items])
+    except Exception as e:
+        conn.rollback()  # A cold cache may have failed its history query
+        st.warning(f"Could not update recommendations: {e}")
+    
+    # Trigger a rerun to refresh the cart details
+    st.rerun()
+
+# Function to display "frequently bought together" products for the cart
+def display_recommendations(recommended_ids, products_df):
+    # Only recommend products that are still in stock
+    products_by_id = products_df.set_index("product_id")
+    recommended_ids = [product_id for product_id in recommended_ids if product_id in products_by_id.index][:RECOMMENDATION_LIMIT]
+    if not recommended_ids:
+        return
+    
+    st.subheader("Frequently Bought Together")
+    columns = st.columns(len(recommended_ids))
+    for column, product_id in zip(columns, recommended_ids):
+        row = products_by_id.loc[product_id]
+        with column:
+            if isinstance(row["product_image"], memoryview):
+                try:
+                    image = Image.open(io.BytesIO(row["product_image"].tobytes()))
+                    st.image(image, width=120)
+                except Exception as e:
+                    st.error(f"Error displaying image for product {row['product_name']}: {e}")
+            elif isinstance(row["product_image"], str):
+                st.image(row["product_image"], width=120)
+            st.write(f"**{row['product_name']}**")
+            st.write(f"${row['product_price']:.2f}")
+    st.write("---")
 
 # Function to display products in a shopping experience format with selection and quantity input
 def display_products_with_cart(products_df):
@@ -158,6 +237,17 @@ def customer_screen():
             # Fetch available products using UIController method
             available_products = ui_controller.fetch_available_products()
             if available_products is not None:
+                # Show precomputed recommendations for the items in the user's own cart
+                user_cart_products = ui_controller.fetch_user_cart_products()
+                if user_cart_products:
+                    try:
+                        engine = get_recommendation_engine(conn)
+                        recommended_ids = engine.recommend(user_cart_products)
+                        display_recommendations(recommended_ids, available_products)
+                    except Exception as e:
+                        conn.rollback()  # Keep the connection usable for the product list
+                        st.warning(f"Recommendations are unavailable: {e}")
+                
                 # Add dropdown filter for product types
                 product_types = available_products["product_type"].dropna().unique()  # Get distinct product types
                 selected_type = st.selectbox("Filter by Product Type", options=["All"] + list(product_types))
@@ -4,6 +4,10 @@ import pandas as pd
 import io
 
 
+# Resampling frequencies offered by the revenue analytics view
+RESAMPLE_FREQUENCIES = {"Day": "D", "Week": "W", "Month": "MS"}
+
+
 # Function to fetch manager data
 def fetch_manager_data(conn):
     try:
@@ -28,6 +32,91 @@ def get_revenue(conn, start_date, end_date):
         st.error(f"Error retrieving revenue: {e}")
         
 
+# Function to fetch daily revenue per product type in a single query.
+# Cached so that changing the resampling or moving average controls on rerun
+# does not hit the database again; the leading underscore keeps Streamlit
+# from trying to hash the connection. Errors are raised rather than returned
+# so that a failed query is not cached.
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_daily_revenue(_conn, start_date, end_date):
+    query = """select c.insert_ts::date as "Date", p.product_type as "Product Type",
+    sum(c.product_price*c.quantity) as "Revenue"
+    from ONLINE_RETAIL.cart_info c
+    join ONLINE_RETAIL.product_info p
+    on c.product_id = p.product_id
+    where c.insert_ts::date between %s and %s
+    group by "Date", "Product Type"
+    order by "Date";"""
+    df = pd.read_sql_query(query, _conn, params=(start_date, end_date), parse_dates=["Date"])
+    df["Revenue"] = df["Revenue"].astype(float)
+    return df
+
+
+# Function to build the revenue time series from daily totals.
+# Returns a per-product-type breakdown and a summary frame holding the total,
+# its moving average and period-over-period deltas, all at the chosen frequency.
+def compute_revenue_analytics(daily_df, start_date, end_date, freq, window):
+    # Pivot to one column per product type and fill days without sales with 0
+    by_type = daily_df.pivot_table(index="Date", columns="Product Type", values="Revenue", aggfunc="sum", fill_value=0.0)
+    all_days = pd.date_range(start_date, end_date, freq="D", name="Date")
+    by_type = by_type.reindex(all_days, fill_value=0.0)
+    by_type = by_type.resample(freq).sum()
+
+    total = by_type.sum(axis=1)
+    previous = total.shift(1)
+    summary = pd.DataFrame({
+        "Revenue": total,
+        f"{window}-Period Moving Average": total.rolling(window, min_periods=1).mean(),
+        "Change": total - previous,
+        "Change (%)": (total - previous) / previous.where(previous > 0) * 100,
+    })
+    return by_type, summary
+
+
+#Function to render revenue analytics charts and tables
+def print_revenue_analytics(by_type, summary):
+    latest = summary.iloc[-1]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Revenue", f"{summary['Revenue'].sum():,.2f}")
+    col2.metric("Latest Period", f"{latest['Revenue']:,.2f}",
+                delta=None if pd.isna(latest["Change"]) else f"{latest['Change']:,.2f}")
+    col3.metric("Average per Period", f"{summary['Revenue'].mean():,.2f}")
+
+    st.subheader("Revenue Trend")
+    st.line_chart(summary.iloc[:, :2])
+
+    st.subheader("Period-over-Period Change")
+    st.bar_chart(summary["Change"])
+
+    st.subheader("Revenue by Product Type")
+    st.area_chart(by_type)
+
+    with st.expander("Show data"):
+        st.dataframe(summary.join(by_type))
+
+
+# Function to show revenue analytics over a date range
+def get_revenue_analytics(conn, start_date, end_date):
+    if start_date > end_date:
+        st.error("Start Date must be on or before End Date.")
+        return
+    granularity = st.selectbox("Group by", options=list(RESAMPLE_FREQUENCIES))
+    window = st.number_input("Moving average window (periods)", min_value=1, value=7)
+
+    try:
+        daily_df = fetch_daily_revenue(conn, start_date, end_date)
+    except Exception as e:
+        conn.rollback()
+        st.error(f"Error fetching daily revenue: {e}")
+        return
+    if daily_df.empty:
+        st.info("No sales in the selected time interval.")
+        return
+
+    by_type, summary = compute_revenue_analytics(daily_df, start_date, end_date, RESAMPLE_FREQUENCIES[granularity], window)
+    print_revenue_analytics(by_type, summary)
+
+
 # Function to retrieve sales of most popular products
 def get_bestsellers(conn, start_date, end_date, filter):
     try:
@@ -63,8 +152,7 @@ def get_salesreport(conn):
         
 #Function to format and print revenue
 def print_revenue(revenue_df):
-    for index, row in revenue_df.iterrows():
-        st.write(f"**Revenue over selected time interval:**  {row[0]}")
+    st.write(f"**Revenue over selected time interval:**  {revenue_df.iloc[0, 0]}")
         
         
 #Function to format and print popular products and sales report
@@ -84,6 +172,8 @@ def enter_salesinfo_fields(conn, info_type):
     elif info_type == "Revenue":
         if(st.button("Retrieve Info")):
             get_revenue(conn, start_date, end_date)
+    elif info_type == "Revenue Analytics":
+        get_revenue_analytics(conn, start_date, end_date)
     else:
         if(st.button("Retrieve Info")):
             get_salesreport(conn)
@@ -102,9 +192,9 @@ def manager_screen():
             #st.dataframe(manager_data)
         
         #Options for reports; note the blank string inputted for a blank row
-        info_options = ["Revenue", "Bestsellers", "Sales Report"]
+        info_options = ["Revenue", "Revenue Analytics", "Bestsellers", "Sales Report"]
         #Menu for report options
-        st.header("View revenue, bestselling products, or sales report ")
+        st.header("View revenue, revenue analytics, bestselling products, or sales report ")
         info_choice = st.selectbox("Get information on", options = info_options)
         
         enter_salesinfo_fields(conn, info_choice)
@@ -0,0 +1,119 @@
+import threading
+import numpy as np
+import scipy.sparse as sp
+
+
+# Define the RecommendationEngine class
+class RecommendationEngine:
+    """
+    Keeps a sparse product co-occurrence matrix built from the append-only
+    cart history and the top-K "frequently bought together" neighbors of
+    every product. Two products co-occur when the same user has ever put
+    both in the cart, so new cart lines only ever add to the matrix.
+    """
+
+    def __init__(self, top_k=5):
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.product_index = {}  # product_id -> matrix position
+        self.product_ids = []  # matrix position -> product_id
+        self.user_index = {}  # user_id -> basket row
+        self.baskets = sp.csr_matrix((0, 0), dtype=np.int32)  # users x products, 1 if bought
+        self.co_occurrence = sp.csr_matrix((0, 0), dtype=np.int32)  # products x products
+        self.neighbors = {}  # product_id -> list of recommended product_ids
+
+    def _position(self, index, keys, key):
+        if key not in index:
+            index[key] = len(index)
+            if keys is not None:
+                keys.append(key)
+        return index[key]
+
+    def _resize(self):
+        n_users, n_products = len(self.user_index), len(self.product_ids)
+        self.baskets.resize((n_users, n_products))
+        self.co_occurrence.resize((n_products, n_products))
+
+    def build(self, history_df):
+        """
+        Builds the co-occurrence matrix from scratch.
+        Args:
+            history_df (pd.DataFrame): Cart history with user_id and product_id columns.
+        """
+        with self._lock:
+            self._reset()
+            users = np.array([self._position(self.user_index, None, u) for u in history_df["user_id"]], dtype=np.int64)
+            products = np.array([self._position(self.product_index, self.product_ids, p) for p in history_df["product_id"]], dtype=np.int64)
+            shape = (len(self.user_index), len(self.product_ids))
+            baskets = sp.csr_matrix((np.ones(len(users), dtype=np.int32), (users, products)), shape=shape)
+            baskets.data[:] = 1  # Duplicate lines of the same product count once
+            self.baskets = baskets
+            self.co_occurrence = self._without_diagonal(baskets.T @ baskets)
+            self._refresh_neighbors(range(len(self.product_ids)))
+
+    def update(self, user_id, product_ids):
+        """
+        Adds new cart lines for a user and refreshes only the affected neighbor lists.
+        The result matches what build() gives for the history including these lines.
+        Args:
+            user_id (str): User who added the items.
+            product_ids (list): Product IDs that were added to the cart.
+        """
+        with self._lock:
+            user = self._position(self.user_index, None, user_id)
+            positions = {self._position(self.product_index, self.product_ids, p) for p in product_ids}
+            self._resize()
+
+            basket = self.baskets.getrow(user)
+            new_positions = np.array(sorted(positions - set(basket.indices)), dtype=np.int64)
+            if len(new_positions) == 0:
+                return
+
+            n_products = len(self.product_ids)
+            added = sp.csr_matrix(
+                (np.ones(len(new_positions), dtype=np.int32), (np.zeros(len(new_positions), dtype=np.int64), new_positions)),
+                shape=(1, n_products),
+            )
+            # New items pair with everything already in the basket and with each other
+            delta = added.T @ basket + basket.T @ added + added.T @ added
+            self.co_occurrence = self._without_diagonal(self.co_occurrence + delta)
+            user_rows = np.full(len(new_positions), user, dtype=np.int64)
+            self.baskets = self.baskets + sp.csr_matrix((added.data, (user_rows, new_positions)), shape=self.baskets.shape)
+
+            self._refresh_neighbors(np.union1d(new_positions, basket.indices))
+
+    def recommend(self, cart_product_ids, limit=None):
+        """
+        Looks up precomputed neighbors for the products in the cart.
+        Returns:
+            list: Recommended product IDs, best first, excluding items already in the cart.
+        """
+        in_cart = set(cart_product_ids)
+        recommended = []
+        for product_id in cart_product_ids:
+            for neighbor in self.neighbors.get(product_id, []):
+                if neighbor not in in_cart and neighbor not in recommended:
+                    recommended.append(neighbor)
+        return recommended[:limit]
+
+    @staticmethod
+    def _without_diagonal(matrix):
+        matrix = sp.csr_matrix(matrix)
+        matrix = matrix - sp.diags(matrix.diagonal(), format="csr", dtype=matrix.dtype)
+        matrix.eliminate_zeros()
+        return matrix
+
+    def _refresh_neighbors(self, positions):
+        co = self.co_occurrence
+        for position in positions:
+            start, end = co.indptr[position], co.indptr[position + 1]
+            columns, counts = co.indices[start:end], co.data[start:end]
+            if len(counts) > self.top_k:
+                keep = np.argpartition(-counts, self.top_k - 1)[:self.top_k]
+                columns, counts = columns[keep], counts[keep]
+            # Highest count first, lower product position breaks ties
+            order = np.lexsort((columns, -counts))
+            self.neighbors[self.product_ids[position]] = [self.product_ids[c] for c in columns[order]]